@@ -1,5 +1,4 @@
 import logging
-import json
 from arcgis.gis import GIS
 from io import BytesIO
 
@@ -27,9 +26,9 @@ class AGOManager:
             raise ConnectionError("Failed to connect to AGOL.")
     
 
-    def publish_feature_layer_from_geojson(self, geojson_dict, title, geojson_name, item_desc, folder):
+    def publish_feature_layer_from_geojson(self, geojson, title, geojson_name, item_desc, folder):
         """
-        Publishes a GeoJSON dictionary to AGO as a Feature Layer, overwriting if it already exists.
+        Publishes GeoJSON bytes to AGO as a Feature Layer, overwriting if it already exists.
         """
         if not self.gis:
             raise RuntimeError("Not connected to AGOL. Please call connect() first.")
@@ -56,7 +55,7 @@ class AGOManager:
                 'description': item_desc,
                 'fileName': f'{geojson_name}.geojson'
             }
-            geojson_file = BytesIO(json.dumps(geojson_dict).encode('utf-8'))
+            geojson_file = BytesIO(geojson)
             new_geojson_item = self.gis.content.add(
                 item_properties=geojson_item_properties, data=geojson_file, folder=folder)
 
@@ -26,106 +26,152 @@ from ago_manager import AGOManager
 
 import pandas as pd
 import geopandas as gpd
+import shapely
+import connectorx as cx
 
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import timeit
 
 
-def read_assets(conn) -> pd.DataFrame:
+# Assets columns (source: published name)
+AST_COLS= {
+    'assetid': 'Asset ID', 
+    'gisid': 'GIS ID', 
+    'park': 'Park',
+    'park_subarea': 'Park Subarea', 
+    'asset_category': 'Category', 
+    'asset_type': 'Segment', 
+    'description': 'Description', 
+    'campsite_number': 'Campsite Number', 
+    'name': 'Name', 
+    'accessible': 'Is Asset Accessible',
+    'route_accessible': 'Is the Route to the Asset Accessible', 
+    'gis_latitude': 'GIS Latitude', 
+    'gis_longitude': 'GIS Longitude',
+    'geometry': 'geometry'
+}
+
+
+def read_postgis_chunked(conn, query, geom_col, params=None, chunksize=50000) -> gpd.GeoDataFrame:
     """
-    Read Postgres tables and Returns a dataframe containing assets point data 
+    Returns a geodataframe from a PostGIS query.
+    Rows are streamed in chunks through a server-side (named) cursor
+    and geometries are parsed from WKB in a single vectorized call.
     """
-    # Fetch tables and schema names
-    sqlTabs= """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'assets'
-     """
+    chunks = []
+    with conn.cursor(name='stream') as cur:
+        cur.itersize = chunksize
+        cur.execute(query, params)
+        rows = cur.fetchmany(chunksize)
+        # (named cursors only expose the description after the first fetch)
+        cols = [desc[0] for desc in cur.description]
+        while rows:
+            # coerce_float: numeric (Decimal) values to floats, as read_postgis does
+            chunks.append(
+                pd.DataFrame.from_records(rows, columns=cols, coerce_float=True)
+            )
+            rows = cur.fetchmany(chunksize)
+        
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True, copy=False)
+    else:
+        df = pd.DataFrame(columns=cols)
     
-    df_tabs_assets = pd.read_sql(sqlTabs, conn)
+    # parse (E)WKB geometries and get the CRS from their SRID
+    geoms = shapely.from_wkb(df[geom_col].to_numpy())
+    srids = shapely.get_srid(geoms[~shapely.is_missing(geoms)])
+    crs = int(srids[0]) if len(srids) > 0 and srids[0] > 0 else None
     
-    tab_names= [
-        x for x in df_tabs_assets['table_name'].to_list() 
-            if x !='qgis_projects'
-    ]
-
-    # Read tables
-    assets_dict= {}
-    for table_name in tab_names:
-        logging.info (f'..reading table: {table_name}')
-        if table_name in ['trails', 'roads']: #centroids
-            query= f"""
-                SELECT 
-                    *, 
-                    ST_Y(
-                        ST_Transform(
-                            ST_Centroid(wkb_geometry), 
-                            4326
-                        )
-                    ) AS gis_latitude,
-                    ST_X(
-                        ST_Transform(
-                            ST_Centroid(wkb_geometry), 
-                            4326
-                        )
-                    ) AS gis_longitude
-                FROM 
-                	assets.{table_name};
-                """
-                
-        else:
-            query = f"""
-                        SELECT 
-                            *, 
-                            ST_Y(
-                                ST_Transform(
-                                    wkb_geometry, 
-                                    4326
-                                )
-                            ) AS gis_latitude,
-                            ST_X(
-                                ST_Transform(
-                                    wkb_geometry, 
-                                    4326
-                                )
-                            ) AS gis_longitude
-                        FROM
-                        	assets.{table_name};
-                    """
-                    
-        df = pd.read_sql(query, conn)
-        df.drop(columns=['wkb_geometry'], inplace=True)
-        assets_dict[table_name]= df
-        
-        #concatinate tables data into a signle df
-        df = pd.concat(
-            assets_dict.values(), 
-            ignore_index=True
-        )
-
-    return df
+    df[geom_col] = geoms
+    
+    return gpd.GeoDataFrame(df, geometry=geom_col, crs=crs)
 
 
-def read_trails(conn) -> gpd.GeoDataFrame:
+def read_asset_table(pg, table_name, columns, cats) -> gpd.GeoDataFrame:
     """
-    Returns a geodataframe containing trails line data 
+    Returns a geodataframe containing the points of a single assets table.
+    The table is read with connectorx, straight into pandas buffers.
     """
-    query = "SELECT * FROM assets.trails"
-    gdf = gpd.read_postgis(
-        query, 
-        conn, 
-        geom_col='wkb_geometry'
+    logging.info (f'..reading table: {table_name}')
+    if table_name in ['trails', 'roads']: #centroids
+        geom= 'ST_Transform(ST_Centroid(wkb_geometry), 4326)'
+    else:
+        geom= 'ST_Transform(wkb_geometry, 4326)'
+    
+    # connectorx doesn't support the PostGIS geometry type nor query parameters:
+    # attribute columns are listed explicitly and the geometry is read as WKB
+    cols_sql= ', '.join('"{}"'.format(col.replace('"', '""')) for col in columns)
+    cats_sql= ', '.join("'{}'".format(cat.replace("'", "''")) for cat in cats)
+        
+    query= f"""
+        SELECT 
+            {cols_sql}, 
+            ST_Y({geom}) AS gis_latitude,
+            ST_X({geom}) AS gis_longitude,
+            ST_AsBinary({geom}) AS geometry
+        FROM 
+            assets.{table_name}
+        WHERE 
+            asset_category IN ({cats_sql})
+            -- keep only points within BC
+            AND ST_Intersects(
+                {geom},
+                ST_MakeEnvelope(-145, 47, -113, 60, 4326)
+            )
+        """
+    
+    df = cx.read_sql(pg.uri, query, return_type='pandas')
+    
+    # connectorx returns nullable dtypes (boolean, Int64): cast them back to the
+    # dtypes pd.read_sql returned, so the published field types are unchanged
+    for col, dtype in zip(df.columns, df.dtypes):
+        if isinstance(dtype, pd.BooleanDtype):
+            if df[col].hasnans:
+                df[col] = df[col].astype(object).where(df[col].notna(), None)
+            else:
+                df[col] = df[col].astype(bool)
+        elif pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_integer_dtype(dtype):
+            df[col] = df[col].astype('float64' if df[col].hasnans else 'int64')
+    
+    df['geometry'] = shapely.from_wkb(df['geometry'].to_numpy())
+    
+    gdf = gpd.GeoDataFrame(
+        df,
+        geometry='geometry',
+        crs="EPSG:4326"
     )
     
     return gdf
+    
 
-
-def process_assets (df, latcol, loncol) -> gpd.GeoDataFrame:
+def read_assets(pg, max_workers=8) -> gpd.GeoDataFrame:
     """
-    Returns a gdf of clean Assets data
+    Read Postgres tables and Returns a geodataframe containing assets point data 
     """
-    # Filter asset categories
-    logging.info('..filtering Assets Categories')
+    # Fetch tables and column names: only the Assets attribute cols are read
+    # (lat/long and geometry are computed in the table queries)
+    attr_cols= [
+        col for col in AST_COLS 
+            if col not in ['gis_latitude', 'gis_longitude', 'geometry']
+    ]
+    attr_cols_sql= ', '.join(f"'{col}'" for col in attr_cols)
+    
+    sqlCols= f"""
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = 'assets'
+            AND table_name <> 'qgis_projects'
+            AND column_name IN ({attr_cols_sql})
+        ORDER BY table_name, ordinal_position
+     """
+    
+    df_cols_assets = cx.read_sql(pg.uri, sqlCols, return_type='pandas')
+    
+    tab_cols= df_cols_assets.groupby('table_name', sort=False)['column_name'].apply(list).to_dict()
+
+    # Asset categories to keep
     cats=[
         'Grounds',
         'Furniture and Amenities',
@@ -143,59 +189,66 @@ def process_assets (df, latcol, loncol) -> gpd.GeoDataFrame:
         'Fuel Storage'
     ]
     
-    df= df[df['asset_category'].isin(cats)]
-    
-    logging.info('..cleaning-up Assets column names')
-    ast_cols= {
-        'assetid': 'Asset ID', 
-        'gisid': 'GIS ID', 
-        'park': 'Park',
-        'park_subarea': 'Park Subarea', 
-        'asset_category': 'Category', 
-        'asset_type': 'Segment', 
-        'description': 'Description', 
-        'campsite_number': 'Campsite Number', 
-        'name': 'Name', 
-        'accessible': 'Is Asset Accessible',
-        'route_accessible': 'Is the Route to the Asset Accessible', 
-        'gis_latitude': 'GIS Latitude', 
-        'gis_longitude': 'GIS Longitude'
-            }
-    
-    df.rename(
-        columns= ast_cols, 
-        inplace= True
+    # Read tables concurrently (queries are network-bound)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tab_cols))) as executor:
+        gdfs = list(
+            executor.map(
+                lambda table_name: read_asset_table(pg, table_name, tab_cols[table_name], cats), 
+                tab_cols
+            )
+        )
+        
+    #concatinate tables data into a signle gdf
+    gdf = pd.concat(
+        gdfs, 
+        ignore_index=True,
+        copy=False
+    )
+
+    return gdf
+
+
+def read_trails(conn) -> gpd.GeoDataFrame:
+    """
+    Returns a geodataframe containing trails line data 
+    """
+    query = "SELECT * FROM assets.trails"
+    gdf = read_postgis_chunked(
+        conn, 
+        query, 
+        geom_col='wkb_geometry'
     )
     
-    #change cols order
-    df = df[ast_cols.values()]
-    
-    logging.info('..cleaning-up missing/out-of-range coordinates')
-    # remove missing lat/longs
-    df = df.dropna(subset=[latcol, loncol])
-    
-    # keep only points within BC
-    lat_min, lat_max = 47, 60
-    lon_min, lon_max = -145, -113
+    return gdf
 
-    df = df[
-        (df[latcol] >= lat_min) & (df[latcol] <= lat_max) &
-        (df[loncol] >= lon_min) & (df[loncol] <= lon_max)
-    ]
+
+def process_assets (gdf) -> gpd.GeoDataFrame:
+    """
+    Returns a gdf of clean Assets data
+    """
+    logging.info('..cleaning-up Assets column names')
     
-    logging.info('..converting the Assets dataset to geodataframe')
-    gdf = gpd.GeoDataFrame(
-        df,
-        geometry=gpd.points_from_xy(df[loncol], df[latcol]),
-        crs="EPSG:4326"
+    #rename and change cols order in a single pass
+    gdf = gdf.rename(
+        columns= AST_COLS, 
+        copy= False
+    ).reindex(
+        columns= list(AST_COLS.values()), 
+        copy= False
     )
     
     gdf = gdf.set_geometry("geometry")
     
-    # convert object cols to strings (objects not supported by fiona)
-    gdf = gdf.astype(
-        {col: 'str' for col in gdf.select_dtypes(include=['object']).columns}
-    )  
+    # convert object cols to (nullable, Arrow-backed) strings
+    str_cols = [
+        col for col, dtype in zip(gdf.columns, gdf.dtypes) 
+            if dtype == object and col != 'geometry'
+    ]
+    if str_cols:
+        gdf = gdf.astype(
+            {col: pd.StringDtype('pyarrow') for col in str_cols}
+        )
+    
     logging.info(f'..the final Assets dataset has {gdf.shape[0]} rows and {gdf.shape[1]} columns')
     
     return gdf
@@ -224,14 +277,15 @@ def process_trails(gdf) -> gpd.GeoDataFrame:
         "wkb_geometry": "geometry"
             }
     
-    gdf.rename(
+    #rename and change cols order in a single pass
+    gdf = gdf.rename(
         columns= trl_cols, 
-        inplace= True
+        copy= False
+    ).reindex(
+        columns= list(trl_cols.values()), 
+        copy= False
     )
     
-    #change cols order
-    gdf = gdf[trl_cols.values()]
-    
     
     # reproject trails gdf to wgs84
     gdf = gdf.set_geometry("geometry")
@@ -242,45 +296,162 @@ def process_trails(gdf) -> gpd.GeoDataFrame:
         inplace= True
     )
     
-    # convert object cols to strings (objects not supported by fiona)
-    gdf = gdf.astype(
-        {col: 'str' for col in gdf.select_dtypes(include=['object']).columns}
-    )
+    # convert object cols to (nullable, Arrow-backed) strings and fill missing values
+    str_cols = [
+        col for col, dtype in zip(gdf.columns, gdf.dtypes) 
+            if dtype == object and col != 'geometry'
+    ]
+    if str_cols:
+        gdf = gdf.astype(
+            {col: pd.StringDtype('pyarrow') for col in str_cols}
+        ).fillna(
+            {col: '' for col in str_cols}
+        )
     
     logging.info(f'..the final Trails dataset has {gdf.shape[0]} rows and {gdf.shape[1]} columns')
     
     return gdf
 
 
-def gdf_to_geojson(gdf) -> dict:
+def gdf_to_geojson(gdf) -> bytes:
     """
-    Converts a GeoDataFrame to a GeoJSON-like dictionary.
+    Converts a GeoDataFrame to UTF-8 encoded GeoJSON.
     Standalone function for pre-processing GeoDataFrames.
+    Features are assembled as strings, column-wise, and streamed
+    into a buffer (no intermediate GeoJSON dictionary).
     """
-    # Clean the GeoDataFrame
-    gdf = gdf.fillna('')
-    gdf = gdf.replace("None", "")
-    
-    features = []
-    for _, row in gdf.iterrows():
-        feature = {
-            "type": "Feature",
-            "properties": {},
-            "geometry": row['geometry'].__geo_interface__
-        }
-        for column, value in row.items():
-            if column != 'geometry':
-                if isinstance(value, (datetime, pd.Timestamp)):
-                    feature['properties'][column] = value.isoformat() if not pd.isna(value) else ''
-                else:
-                    feature['properties'][column] = value
-        features.append(feature)
+    # Clean the attributes in a single, dtype-aware pass over the columns
+    # (the geometry is handled separately: missing geometries can't be filled with '')
+    attrs = {}
+    for col in gdf.columns:
+        if col == gdf.geometry.name:
+            continue
+        
+        values = gdf[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            # datetimes to ISO strings (vectorized)
+            values = values.dt.strftime('%Y-%m-%dT%H:%M:%S').fillna('')
+        elif values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+            values = values.fillna('').mask(values == 'None', '')
+        elif values.hasnans:
+            values = values.astype(object).where(values.notna(), '')
+            
+        attrs[col] = values
+        
+    attrs = pd.DataFrame(attrs, index=gdf.index)
+    
+    # Build geometry strings
+    if (gdf.geom_type == 'Point').all():
+        geoms = (
+            '{"type":"Point","coordinates":[' + 
+            gdf.geometry.x.round(6).astype(str) + ',' + 
+            gdf.geometry.y.round(6).astype(str) + ']}'
+        )
+    else:
+        # lines (trails) and other types: vectorized GEOS GeoJSON writer
+        geoms = pd.Series(
+            shapely.to_geojson(gdf.geometry.values), 
+            index=gdf.index
+        ).fillna('null') # missing geometries
+    
+    # Build properties strings (one JSON record per line)
+    props = pd.Series(
+        attrs.to_json(orient='records', lines=True).splitlines(),
+        index=gdf.index
+    )
+    
+    features = (
+        '{"type":"Feature","properties":' + props + 
+        ',"geometry":' + geoms + '}'
+    )
+    
+    buffer = BytesIO()
+    buffer.write(b'{"type":"FeatureCollection","features":[')
+    buffer.write(','.join(features).encode('utf-8'))
+    buffer.write(b']}')
     
-    geojson_dict = {
-        "type": "FeatureCollection",
-        "features": features
-    }
-    return geojson_dict
+    return buffer.getvalue()
+
+
+def prepare_assets(pg) -> bytes:
+    """
+    Reads and processes the Assets data.
+    Returns the Assets GeoJSON (None if the dataset is empty)
+    """
+    logging.info("..reading Assets (points) data")
+    gdf_ast= read_assets(pg)
+    
+    logging.info("..processing Assets data")
+    gdf_ast= process_assets (gdf_ast)
+    
+    if gdf_ast.shape[0] > 0:
+        logging.info("..converting Assets to GeoJSON")
+        return gdf_to_geojson(gdf_ast)
+    else:
+        logging.warning("..Assets dataset is empty")
+        return None
+    
+    
+def prepare_trails(conn) -> bytes:
+    """
+    Reads and processes the Trails data.
+    Returns the Trails GeoJSON (None if the dataset is empty)
+    """
+    logging.info("..reading Trails (line) data")
+    gdf_trl= read_trails(conn)
+    
+    logging.info("..processing Trails data")
+    gdf_trl= process_trails(gdf_trl)
+    
+    if gdf_trl.shape[0] > 0:
+        logging.info("..converting Trails to GeoJSON")
+        return gdf_to_geojson(gdf_trl)
+    else:
+        logging.warning("..Trails dataset is empty")
+        return None
+
+
+def publish_to_account(acct, ago_host, geojson_assets, geojson_trails):
+    """
+    Publishes the Assets and Trails feature layers to an AGO account.
+    Both layers are published through the same connection (GIS object).
+    """
+    try:
+        logging.info(f'\nLogging into AGO ({acct["label"]} account)')
+        ago = AGOManager(ago_host, acct["username"], acct["password"])
+        ago.connect()
+
+        # Assets - using pre-converted GeoJSON
+        logging.info(f'\nPublishing Assets for {acct["label"]}')
+        if geojson_assets:
+            ago.publish_feature_layer_from_geojson(
+                geojson_assets,
+                title=acct["asset_title"],
+                geojson_name='bcparks_assets_v2',
+                item_desc=f'Point dataset - BCParks assets (updated on {datetime.today():%B %d, %Y})',
+                folder=acct["folder"]
+            )
+        else:
+            logging.error('..Assets dataset is empty. Skipping.')
+
+        # Trails - using pre-converted GeoJSON
+        logging.info(f'\nPublishing Trails for {acct["label"]}')
+        if geojson_trails:
+            ago.publish_feature_layer_from_geojson(
+                geojson_trails,
+                title=acct["trail_title"],
+                geojson_name='bcparks_trails_v2',
+                item_desc=f'Line dataset - BCParks trails (updated on {datetime.today():%B %d, %Y})',
+                folder=acct["folder"]
+            )
+        else:
+            logging.error('..Trails dataset is empty. Skipping.')
+
+    except Exception as e:
+        raise Exception(f"Error publishing to {acct['label']} AGO account: {e}")
+
+    finally:
+        ago.disconnect()
 
 
 
@@ -288,7 +459,7 @@ if __name__ == "__main__":
     start_t = timeit.default_timer() #start time
     logging.basicConfig(level=logging.INFO, format='%(message)s')
     
-    #read and process data from postgres
+    #read, process and convert data from postgres
     try:
         logging.info("Connecting to CityWide database")
         PG_HOST_CW= os.getenv('PG_HOST_CW').rstrip()
@@ -306,46 +477,21 @@ if __name__ == "__main__":
         )
         conn= pg.connect()
         
-        logging.info("\nReading Assets (points) data")
-        df_ast= read_assets(conn)
-        
-        logging.info("\nReading Trails (line) data")
-        gdf_trl= read_trails(conn)
-        
-        logging.info("\nProcessing Assets data")
-        #assets
-        latcol = 'GIS Latitude'
-        loncol = 'GIS Longitude'
-        gdf_ast= process_assets (df_ast, latcol, loncol)
-        
-        logging.info("\nProcessing Trails data")
-        #trails
-        gdf_trl= process_trails(gdf_trl)
-        
+        # Assets (connectorx) and Trails (psycopg2 connection) are independent: 
+        # run them concurrently
+        logging.info("\nReading, processing and converting Assets and Trails data")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future_assets = executor.submit(prepare_assets, pg)
+            future_trails = executor.submit(prepare_trails, conn)
+            
+            geojson_assets = future_assets.result()
+            geojson_trails = future_trails.result()
         
     except Exception as e:
         raise Exception(f"Error occurred: {e}")  
     
     finally: 
         pg.disconnect()
- 
-    
-    # Pre-convert GeoDataFrames to GeoJSON
-    logging.info("\nPre-converting GeoDataFrames to GeoJSON format")
-    geojson_assets = None
-    geojson_trails = None
-    
-    if gdf_ast.shape[0] > 0:
-        logging.info("..converting Assets to GeoJSON")
-        geojson_assets = gdf_to_geojson(gdf_ast)
-    else:
-        logging.warning("..Assets dataset is empty")
-        
-    if gdf_trl.shape[0] > 0:
-        logging.info("..converting Trails to GeoJSON")
-        geojson_trails = gdf_to_geojson(gdf_trl)
-    else:
-        logging.warning("..Trails dataset is empty")
    
     #publish to multiple AGO accounts
 
@@ -370,47 +516,18 @@ if __name__ == "__main__":
         }
     ]
 
-    for acct in accounts:
-        try:
-            logging.info(f'\nLogging into AGO ({acct["label"]} account)')
-            ago = AGOManager(AGO_HOST, acct["username"], acct["password"])
-            ago.connect()
-
-            # Assets - using pre-converted GeoJSON
-            logging.info(f'\nPublishing Assets for {acct["label"]}')
-            if geojson_assets:
-                ago.publish_feature_layer_from_geojson(
-                    geojson_assets,
-                    title=acct["asset_title"],
-                    geojson_name='bcparks_assets_v2',
-                    item_desc=f'Point dataset - BCParks assets (updated on {datetime.today():%B %d, %Y})',
-                    folder=acct["folder"]
-                )
-            else:
-                logging.error('..Assets dataset is empty. Skipping.')
-
-            # Trails - using pre-converted GeoJSON
-            logging.info(f'\nPublishing Trails for {acct["label"]}')
-            if geojson_trails:
-                ago.publish_feature_layer_from_geojson(
-                    geojson_trails,
-                    title=acct["trail_title"],
-                    geojson_name='bcparks_trails_v2',
-                    item_desc=f'Line dataset - BCParks trails (updated on {datetime.today():%B %d, %Y})',
-                    folder=acct["folder"]
-                )
-            else:
-                logging.error('..Trails dataset is empty. Skipping.')
-
-        except Exception as e:
-            raise Exception(f"Error publishing to {acct['label']} AGO account: {e}")
-
-        finally:
-            ago.disconnect()
+    # each account has its own GIS object (not shared between threads)
+    with ThreadPoolExecutor(max_workers=len(accounts)) as executor:
+        futures = [
+            executor.submit(publish_to_account, acct, AGO_HOST, geojson_assets, geojson_trails)
+                for acct in accounts
+        ]
+        for future in futures:
+            future.result()
 
         
     finish_t = timeit.default_timer() #finish time
     t_sec = round(finish_t-start_t)
     mins = int (t_sec/60)
     secs = int (t_sec%60)
-    logging.info('\nProcessing Completed in {} minutes and {} seconds'.format (mins,secs))
\ No newline at end of file
+    logging.info('\nProcessing Completed in {} minutes and {} seconds'.format (mins,secs))
@@ -4,6 +4,7 @@ from psycopg2 import OperationalError
 from psycopg2 import DatabaseError
 
 import logging
+from urllib.parse import quote
 
 class PostgresDBManager:
     def __init__(self, dbname, user, password, host, port):
@@ -19,6 +20,15 @@ class PostgresDBManager:
         self.cursor = None
 
 
+    @property
+    def uri(self):
+        """Returns the connection URI (e.g. for connectorx)."""
+        return (
+            f"postgresql://{quote(self.user, safe='')}:{quote(self.password, safe='')}"
+            f"@{self.host}:{self.port}/{self.dbname}"
+        )
+    
+    
     def connect(self):
         """Establishes a connection to the PostgreSQL database."""
         try: